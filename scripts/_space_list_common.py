@@ -0,0 +1,63 @@
+"""
+Space ID 诊断脚本共用逻辑
+
+check_space_id.py 与 get_space_id.py 共用同一套客户端构造与分页拉取，
+避免两处各自维护 builder / page_size。
+"""
+from typing import List
+
+import lark_oapi as lark
+from lark_oapi.api.wiki.v2 import ListSpaceRequest
+
+# wiki.v2.space.list 单页上限为 50
+SPACE_PAGE_SIZE = 50
+
+
+class SpaceListError(Exception):
+    """知识库列表 API 调用失败"""
+
+    def __init__(self, code: int, msg: str):
+        super().__init__(f"{msg} (code={code})")
+        self.code = code
+        self.msg = msg
+
+
+def list_spaces(app_id: str, app_secret: str) -> List:
+    """
+    获取应用可见的全部知识库（自动翻页）
+
+    Args:
+        app_id: 飞书 App ID
+        app_secret: 飞书 App Secret
+
+    Returns:
+        知识库列表（lark_oapi Space 对象）
+
+    Raises:
+        SpaceListError: API 返回失败
+    """
+    client = lark.Client.builder() \
+        .app_id(app_id) \
+        .app_secret(app_secret) \
+        .log_level(lark.LogLevel.ERROR) \
+        .build()
+
+    spaces = []
+    page_token = None
+    while True:
+        builder = ListSpaceRequest.builder().page_size(SPACE_PAGE_SIZE)
+        if page_token:
+            builder = builder.page_token(page_token)
+
+        response = client.wiki.v2.space.list(builder.build())
+        if not response.success():
+            raise SpaceListError(response.code, response.msg)
+
+        data = response.data
+        if data and data.items:
+            spaces.extend(data.items)
+        if not data or not data.has_more or not data.page_token:
+            break
+        page_token = data.page_token
+
+    return spaces
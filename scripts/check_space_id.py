@@ -6,6 +6,7 @@
 运行：python scripts/check_space_id.py
 """
 import os
+import re
 import sys
 
 # 添加src到路径
@@ -13,8 +14,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from utils.config import config
 from utils.logger import logger
-import lark_oapi as lark
-from lark_oapi.api.wiki.v2 import ListSpaceRequest
+from _space_list_common import SpaceListError, list_spaces
+
+# Space ID 必须是纯数字（wiki token 如 GKTiw1TSMi... 是常见误配）
+_SPACE_ID_RE = re.compile(r'^\d+$')
 
 
 def check_space_id():
@@ -26,7 +29,8 @@ def check_space_id():
     # 检查配置
     app_id = config.FEISHU_APP_ID
     app_secret = config.FEISHU_APP_SECRET
-    current_space_id = config.FEISHU_KNOWLEDGE_SPACE_ID
+    # 配置值只在读取时规整一次，后续格式校验与列表比对共用
+    current_space_id = (config.FEISHU_KNOWLEDGE_SPACE_ID or '').strip()
 
     if not app_id or not app_secret:
         print("❌ 错误：缺少飞书App配置")
@@ -34,43 +38,36 @@ def check_space_id():
         return
 
     print(f"✓ 当前配置的 FEISHU_KNOWLEDGE_SPACE_ID: {current_space_id or '(未配置)'}")
+    if current_space_id and not _SPACE_ID_RE.match(current_space_id):
+        print("⚠️  当前配置不是纯数字，可能误填了 wiki token，请对照下方列表修正")
     print(f"✓ 正在获取你的所有知识库...\n")
 
     try:
-        # 创建客户端
-        client = lark.Client.builder() \
-            .app_id(app_id) \
-            .app_secret(app_secret) \
-            .log_level(lark.LogLevel.ERROR) \
-            .build()
-
-        # 获取tenant_access_token
-        request = ListSpaceRequest.builder() \
-            .page_size(50) \
-            .build()
-
-        response = client.wiki.v2.space.list(request)
-
-        if not response.success():
-            print(f"❌ API调用失败: {response.msg}")
-            print(f"   错误码: {response.code}")
+        try:
+            spaces = list_spaces(app_id, app_secret)
+        except SpaceListError as e:
+            print(f"❌ API调用失败: {e.msg}")
+            print(f"   错误码: {e.code}")
             return
 
         # 显示所有知识库
-        if not response.data or not response.data.items:
+        if not spaces:
             print("⚠️  未找到任何知识库")
             print("   请确认：")
             print("   1. 飞书应用是否已安装到企业")
             print("   2. 应用是否有wiki权限")
             return
 
-        print(f"找到 {len(response.data.items)} 个知识库：\n")
+        print(f"找到 {len(spaces)} 个知识库：\n")
         print("-" * 80)
 
-        for idx, space in enumerate(response.data.items, 1):
+        # SDK 返回的 space_id 是 str，与已规整的配置值直接比较
+        current_id = current_space_id or None
+
+        for idx, space in enumerate(spaces, 1):
             space_id = space.space_id
             name = space.name
-            is_current = str(space_id) == str(current_space_id)
+            is_current = space_id == current_id
 
             status = "✓ [当前配置]" if is_current else ""
             print(f"{idx}. {name}")
@@ -87,8 +84,8 @@ def check_space_id():
         print("  - GitHub Actions: GitHub Secrets 中的 FEISHU_KNOWLEDGE_SPACE_ID")
         print("\n⚠️  注意：Space ID 必须是纯数字！")
         print("\n示例配置：")
-        if response.data.items:
-            example_id = response.data.items[0].space_id
+        if spaces:
+            example_id = spaces[0].space_id
             print(f"  FEISHU_KNOWLEDGE_SPACE_ID={example_id}")
         print()
 
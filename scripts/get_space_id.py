@@ -4,8 +4,7 @@
 
 用途：通过手动输入App ID和Secret来获取所有知识库的space_id
 """
-import lark_oapi as lark
-from lark_oapi.api.wiki.v2 import ListSpaceRequest
+from _space_list_common import SpaceListError, list_spaces
 
 
 def get_space_id():
@@ -26,30 +25,19 @@ def get_space_id():
     print("\n✓ 正在获取知识库列表...\n")
 
     try:
-        # 创建客户端
-        client = lark.Client.builder() \
-            .app_id(app_id) \
-            .app_secret(app_secret) \
-            .log_level(lark.LogLevel.ERROR) \
-            .build()
-
         # 获取知识库列表
-        request = ListSpaceRequest.builder() \
-            .page_size(50) \
-            .build()
-
-        response = client.wiki.v2.space.list(request)
-
-        if not response.success():
-            print(f"❌ API调用失败: {response.msg}")
-            print(f"   错误码: {response.code}")
+        try:
+            spaces = list_spaces(app_id, app_secret)
+        except SpaceListError as e:
+            print(f"❌ API调用失败: {e.msg}")
+            print(f"   错误码: {e.code}")
             print(f"\n可能的原因：")
             print(f"   1. App ID 或 App Secret 错误")
             print(f"   2. 应用未启用或未发布")
             print(f"   3. 应用缺少wiki权限")
             return
 
-        if not response.data or not response.data.items:
+        if not spaces:
             print("⚠️  未找到任何知识库")
             print("\n请确认：")
             print("   1. 飞书应用是否已安装到企业")
@@ -57,10 +45,10 @@ def get_space_id():
             print("   3. 知识库是否已创建")
             return
 
-        print(f"✅ 找到 {len(response.data.items)} 个知识库：\n")
+        print(f"✅ 找到 {len(spaces)} 个知识库：\n")
         print("="*80)
 
-        for idx, space in enumerate(response.data.items, 1):
+        for idx, space in enumerate(spaces, 1):
             space_id = space.space_id
             name = space.name or "(无名称)"
             space_type = space.space_type or "unknown"
@@ -81,8 +69,8 @@ def get_space_id():
         print()
 
         # 如果只有一个知识库，给出直接的建议
-        if len(response.data.items) == 1:
-            space_id = response.data.items[0].space_id
+        if len(spaces) == 1:
+            space_id = spaces[0].space_id
             print(f"💡 你只有一个知识库，建议配置：")
             print(f"   FEISHU_KNOWLEDGE_SPACE_ID={space_id}")
             print()
@@ -3,26 +3,29 @@
 PDF 使用 Gemini Vision 逐批渲染页面并转换为结构化 HTML，
 可正确还原表格、标题层级、加粗、彩色框、双栏等复杂排版。
 """
+import asyncio
 import base64
-import json
 import os
 import time
-import urllib.request
-import urllib.error
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from html.parser import HTMLParser
 from io import BytesIO
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
-
+from utils.http import get_session
 from utils.logger import logger
+from utils.retry import rate_limit_delay
 from video_processor import _llm_json, _translate_paragraphs
 
 
 # ─── 辅助 ────────────────────────────────────────────────────
 
+# 单次 translate 完成转义，避免三次 replace 各扫一遍并各分配一个新串
+_ESC_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
 def _esc(text: str) -> str:
-    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return text.translate(_ESC_TABLE)
 
 
 def _html_to_plain(html: str) -> str:
@@ -58,7 +61,7 @@ def _download_from_storage(storage_path: str) -> bytes:
     supabase_url = os.environ['SUPABASE_URL']
     service_key = os.environ['SUPABASE_SERVICE_ROLE_KEY']
     url = f'{supabase_url}/storage/v1/object/media-temp/{storage_path}'
-    resp = requests.get(url, headers={'Authorization': f'Bearer {service_key}'}, timeout=60)
+    resp = get_session().get(url, headers={'Authorization': f'Bearer {service_key}'}, timeout=60)
     resp.raise_for_status()
     return resp.content
 
@@ -81,23 +84,18 @@ def _call_gemini_vision(prompt: str, images: List[Tuple[str, str]], timeout: int
         parts.append({'inline_data': {'mime_type': mime_type, 'data': b64_data}})
     parts.append({'text': prompt})
 
-    body = json.dumps({'contents': [{'parts': parts}]}).encode()
-    req = urllib.request.Request(
-        url, data=body, headers={'Content-Type': 'application/json'}
-    )
+    body = {'contents': [{'parts': parts}]}
 
     for attempt in range(3):
-        try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                result = json.loads(resp.read())
-            return result['candidates'][0]['content']['parts'][0]['text']
-        except urllib.error.HTTPError as e:
-            if e.code == 429 and attempt < 2:
-                wait = 20 * (attempt + 1)
-                logger.warning(f'Gemini Vision 429，{wait}s 后重试')
-                time.sleep(wait)
-            else:
-                raise
+        resp = get_session().post(url, json=body, timeout=timeout)
+        if resp.status_code == 429 and attempt < 2:
+            delay = rate_limit_delay(resp, attempt, 20)
+            logger.warning(f'Gemini Vision 429，{delay:.1f}s 后重试')
+            time.sleep(delay)
+            continue
+        resp.raise_for_status()
+        result = resp.json()
+        return result['candidates'][0]['content']['parts'][0]['text']
 
 
 _PDF_VISION_PROMPT = """\
@@ -126,6 +124,7 @@ padding:12px 16px;margin:12px 0;border-radius:6px;background:#f9fafb;">
 
 VISION_MAX_PAGES = 60  # 超过此页数时，仅前 N 页用 Vision，其余降级文字提取
                         # 60 页 = 12 次 Vision API 调用，合理控制免费配额消耗
+_VISION_WORKERS = 3    # Vision 批次并发上限，429 时由 _call_gemini_vision 退避重试
 
 
 def _extract_pdf_vision(raw: bytes) -> Tuple[str, str, str]:
@@ -152,26 +151,41 @@ def _extract_pdf_vision(raw: bytes) -> Tuple[str, str, str]:
     pages = list(doc)
 
     # Vision 处理前 vision_pages 页
+    # fitz 非线程安全：页面渲染留在调用线程，只把 Vision 调用并发提交
     vision_page_list = pages[:vision_pages]
-    for batch_start in range(0, len(vision_page_list), BATCH_SIZE):
-        batch = vision_page_list[batch_start: batch_start + BATCH_SIZE]
-        end = batch_start + len(batch)
-        logger.info(f'  Vision 第 {batch_start + 1}–{end} / {total_pages} 页')
-
-        images: List[Tuple[str, str]] = []
-        for page in batch:
-            pix = page.get_pixmap(dpi=DPI)
-            png_bytes = pix.tobytes('png')
-            images.append(('image/png', base64.b64encode(png_bytes).decode()))
-
+    batches = [
+        vision_page_list[i: i + BATCH_SIZE]
+        for i in range(0, len(vision_page_list), BATCH_SIZE)
+    ]
+    futures = []
+    if batches:
+        workers = min(_VISION_WORKERS, len(batches))
+        logger.info(f'  Vision 共 {len(batches)} 批，并发 {workers}')
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # 每渲染完一批立即提交：渲染与已在途的 Vision 调用重叠，首个请求不必等整份文档渲染完；
+            # 在途批次达到并发上限时先等一批完成再渲染，内存中最多只留 workers+1 批截图
+            for batch in batches:
+                in_flight = [f for f in futures if not f.done()]
+                if len(in_flight) >= workers:
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                images: List[Tuple[str, str]] = []
+                for page in batch:
+                    pix = page.get_pixmap(dpi=DPI)
+                    png_bytes = pix.tobytes('png')
+                    images.append(('image/png', base64.b64encode(png_bytes).decode()))
+                futures.append(pool.submit(_call_gemini_vision, _PDF_VISION_PROMPT, images, 180))
+
+    # 按页序组装；失败批次降级为文字提取
+    for idx, (batch, future) in enumerate(zip(batches, futures)):
+        start = idx * BATCH_SIZE
+        end = start + len(batch)
         try:
-            chunk_html = _call_gemini_vision(_PDF_VISION_PROMPT, images, timeout=180)
-            chunk_html = _strip_code_fence(chunk_html)
+            chunk_html = _strip_code_fence(future.result())
             if chunk_html:
                 html_parts.append(chunk_html)
                 plain_parts.append(_html_to_plain(chunk_html))
         except Exception as e:
-            logger.warning(f'Vision 第 {batch_start + 1}–{end} 页失败，降级: {e}')
+            logger.warning(f'Vision 第 {start + 1}–{end} 页失败，降级: {e}')
             for page in batch:
                 text = page.get_text().strip()
                 if text:
@@ -372,31 +386,40 @@ def _extract_pptx(raw: bytes) -> Tuple[str, str, str]:
 
 def _extract_text_file(raw: bytes) -> Tuple[str, str, str]:
     text = raw.decode('utf-8', errors='replace')
-    first_line = text.split('\n')[0].strip().lstrip('#').strip()
+    # 统一 \r\n 后再按空行分段（Windows 导出的 txt 否则整篇只有一段）
+    normalized = text.replace('\r\n', '\n')
+    first_line = normalized.partition('\n')[0].strip().lstrip('#').strip()
     title = first_line[:80] if first_line else ''
-    paras = [p.strip() for p in text.split('\n\n') if p.strip()]
+    paras = [p.strip() for p in normalized.split('\n\n') if p.strip()]
     html_parts = [f'<p>{_esc(p)}</p>' for p in paras]
     return '\n'.join(html_parts), text, title
 
 
 # ─── 统一入口 ────────────────────────────────────────────────
 
+def _extract_pdf(raw: bytes) -> Tuple[str, str, str]:
+    if os.environ.get('GEMINI_API_KEY', ''):
+        return _extract_pdf_vision(raw)
+    logger.warning('GEMINI_API_KEY 未设置，降级为字体分析提取')
+    return _extract_pdf_dict(raw)
+
+
+# 扩展名 → 提取函数
+_EXTRACTORS = {
+    'pdf': _extract_pdf,
+    'docx': _extract_docx,
+    'pptx': _extract_pptx,
+    'txt': _extract_text_file,
+    'md': _extract_text_file,
+}
+
+
 def _extract_document(raw: bytes, ext: str) -> Tuple[str, str, str]:
     """返回 (body_html, plain_text, title)"""
-    if ext == 'pdf':
-        has_gemini = bool(os.environ.get('GEMINI_API_KEY', ''))
-        if has_gemini:
-            return _extract_pdf_vision(raw)
-        logger.warning('GEMINI_API_KEY 未设置，降级为字体分析提取')
-        return _extract_pdf_dict(raw)
-    elif ext == 'docx':
-        return _extract_docx(raw)
-    elif ext == 'pptx':
-        return _extract_pptx(raw)
-    elif ext in ('txt', 'md'):
-        return _extract_text_file(raw)
-    else:
+    extractor = _EXTRACTORS.get(ext)
+    if extractor is None:
         raise ValueError(f'不支持的格式：.{ext}')
+    return extractor(raw)
 
 
 # ─── 语言检测 ────────────────────────────────────────────────
@@ -490,10 +513,10 @@ async def handle_document(article_id: str) -> Dict[str, Any]:
                 'error_message': '暂不支持 .ppt 格式，请转换为 .pptx 后重新发送。'}
 
     logger.info(f'下载文档：{media_storage_path}')
-    raw_bytes = _download_from_storage(media_storage_path)
+    raw_bytes = await asyncio.to_thread(_download_from_storage, media_storage_path)
 
     logger.info(f'提取内容：ext={ext}，大小={len(raw_bytes)} bytes')
-    body_html, plain_text, title = _extract_document(raw_bytes, ext)
+    body_html, plain_text, title = await asyncio.to_thread(_extract_document, raw_bytes, ext)
 
     if not plain_text.strip():
         return {'article_id': article_id, 'status': 'error',
@@ -502,7 +525,9 @@ async def handle_document(article_id: str) -> Dict[str, Any]:
     is_english = _detect_english(plain_text)
     logger.info(f'语言：{"英文" if is_english else "中文"}，body_html={len(body_html)} chars')
 
-    content_html = _build_document_html(plain_text, is_english, body_html=body_html)
+    content_html = await asyncio.to_thread(
+        _build_document_html, plain_text, is_english, body_html
+    )
 
     return {
         'article_id': article_id,
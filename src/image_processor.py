@@ -4,6 +4,7 @@
 为何切片：单张超长图直接送 Gemini 会被整体降采样到不可读，只能读到顶部一小段；
 按高度切成多条窄片后，每片在模型内有足够分辨率，可覆盖全文。
 """
+import asyncio
 import base64
 import os
 from io import BytesIO
@@ -67,11 +68,10 @@ def _encode_jpeg_b64(img: Image.Image) -> str:
     return base64.b64encode(buf.getvalue()).decode()
 
 
-def _detect_title(first_strip: Image.Image) -> str:
-    """识别截图开头的原始标题；无则返回空串。"""
+def _detect_title(first_strip_b64: str) -> str:
+    """识别截图开头的原始标题；无则返回空串。入参为首片的 JPEG base64（复用 OCR 已编码结果）"""
     try:
-        b64 = _encode_jpeg_b64(first_strip)
-        raw = _call_gemini_vision(_TITLE_PROMPT, [("image/jpeg", b64)], timeout=60).strip()
+        raw = _call_gemini_vision(_TITLE_PROMPT, [("image/jpeg", first_strip_b64)], timeout=60).strip()
         if raw in ("", "-", "—"):
             return ""
         return raw[:120]
@@ -80,6 +80,17 @@ def _detect_title(first_strip: Image.Image) -> str:
         return ""
 
 
+def _slice_and_encode(raw: bytes) -> List[str]:
+    """解码长截图、切片并逐片编码为 JPEG base64（每片只编码一次：OCR 批次与标题识别共用）"""
+    img = Image.open(BytesIO(raw))
+    w, h = img.size
+    logger.info(f"图片尺寸 {w}x{h}，开始切片")
+
+    strips = _slice_image(img)
+    logger.info(f"共 {len(strips)} 片，逐批 OCR")
+    return [_encode_jpeg_b64(s) for s in strips]
+
+
 async def handle_image(article_id: str) -> Dict[str, Any]:
     media_storage_path = os.environ.get("MEDIA_STORAGE_PATH", "")
     if not media_storage_path:
@@ -87,21 +98,18 @@ async def handle_image(article_id: str) -> Dict[str, Any]:
                 "error_message": "MEDIA_STORAGE_PATH 未设置"}
 
     logger.info(f"下载长截图：{media_storage_path}")
-    raw = _download_from_storage(media_storage_path)
-    img = Image.open(BytesIO(raw))
-    w, h = img.size
-    logger.info(f"图片尺寸 {w}x{h}，开始切片")
-
-    strips = _slice_image(img)
-    logger.info(f"共 {len(strips)} 片，逐批 OCR")
+    raw = await asyncio.to_thread(_download_from_storage, media_storage_path)
+    encoded = await asyncio.to_thread(_slice_and_encode, raw)
 
     # 逐批 OCR
     html_parts: List[str] = []
-    for start in range(0, len(strips), BATCH_SIZE):
-        batch = strips[start:start + BATCH_SIZE]
-        images: List[Tuple[str, str]] = [("image/jpeg", _encode_jpeg_b64(s)) for s in batch]
-        logger.info(f"  OCR 第 {start + 1}–{start + len(batch)} / {len(strips)} 片")
-        chunk = _strip_code_fence(_call_gemini_vision(_OCR_PROMPT, images, timeout=180))
+    for start in range(0, len(encoded), BATCH_SIZE):
+        batch = encoded[start:start + BATCH_SIZE]
+        images: List[Tuple[str, str]] = [("image/jpeg", b64) for b64 in batch]
+        logger.info(f"  OCR 第 {start + 1}–{start + len(batch)} / {len(encoded)} 片")
+        chunk = _strip_code_fence(
+            await asyncio.to_thread(_call_gemini_vision, _OCR_PROMPT, images, 180)
+        )
         if chunk:
             html_parts.append(chunk)
 
@@ -110,7 +118,7 @@ async def handle_image(article_id: str) -> Dict[str, Any]:
         return {"article_id": article_id, "status": "error",
                 "error_message": "未能从图片中提取到文字"}
 
-    title = _detect_title(strips[0])
+    title = await asyncio.to_thread(_detect_title, encoded[0])
     plain_text = _html_to_plain(body_html)
 
     # 文字在前，原始整图作为附件占位符放末尾（插件端替换为 Vault 附件）
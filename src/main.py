@@ -9,7 +9,8 @@ import base64
 import os
 import re
 import traceback
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
 
 from bs4 import BeautifulSoup
 
@@ -31,6 +32,11 @@ WECHAT_REFERER = "https://mp.weixin.qq.com/"
 # 微信图片懒加载：真实地址在 data-src，src 是 1x1 占位 SVG
 _LAZY_ATTRS = ('data-src', 'data-original', 'data-actualsrc', 'data-backsrc')
 
+_YOUTUBE_ID_RE = re.compile(r"(?:v=|youtu\.be/)([^&\s]+)")
+
+# 正文图片并发下载数：纯 I/O，互不依赖
+_IMG_WORKERS = 8
+
 _MIME_BY_EXT = {
     '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png',
     '.gif': 'image/gif', '.webp': 'image/webp', '.svg': 'image/svg+xml',
@@ -42,11 +48,19 @@ def _guess_mime(filename: str) -> str:
     return _MIME_BY_EXT.get(ext, 'image/jpeg')
 
 
-def _clean_html(html: str) -> str:
+def _fetch_image(src: str) -> Tuple[str, bytes]:
+    referer = WECHAT_REFERER if 'mmbiz' in src else None
+    return download_to_bytes(src, referer=referer)
+
+
+def _clean_html(html: str) -> Tuple[str, str]:
     """清洗微信正文 HTML：
     1. 懒加载 data-src 提升为 src
     2. 删除 script/style/iframe 等无用/危险标签（保留元素 style 属性）
-    3. 图片下载并以 base64 data URI 内联（Obsidian 渲染稳定，自包含）
+    3. 图片并发下载并以 base64 data URI 内联（Obsidian 渲染稳定，自包含）
+
+    返回 (清洗后 HTML 片段, 纯文本)。纯文本供 AI 分类，直接取自同一棵树，
+    避免对清洗结果再解析一遍。
     """
     soup = BeautifulSoup(html, 'html.parser')
 
@@ -61,26 +75,32 @@ def _clean_html(html: str) -> str:
     for tag in soup.find_all(['script', 'style', 'iframe', 'noscript']):
         tag.decompose()
 
-    for img in soup.find_all('img'):
-        src = img.get('src', '')
-        if not src.startswith('http'):
-            continue
-        try:
-            referer = WECHAT_REFERER if 'mmbiz' in src else None
-            fname, raw = download_to_bytes(src, referer=referer)
-            mime = _guess_mime(fname)
-            b64 = base64.b64encode(raw).decode('ascii')
-            img['src'] = f'data:{mime};base64,{b64}'
-        except Exception as e:
-            logger.warning(f"图片内联失败，保留原链接 {src}: {e}")
-
-    return str(soup)
-
-
-def _html_to_text(html: str) -> str:
-    """从 HTML 提取纯文本，供 AI 分类（节省 token、避免标签干扰）。"""
-    soup = BeautifulSoup(html, 'html.parser')
-    return soup.get_text(separator='\n', strip=True)
+    targets = [img for img in soup.find_all('img') if img.get('src', '').startswith('http')]
+    if targets:
+        # 同一图片（logo、分割线图等）在正文中常重复出现，按 URL 去重只下载一次
+        unique_srcs = list(dict.fromkeys(img['src'] for img in targets))
+        with ThreadPoolExecutor(max_workers=min(_IMG_WORKERS, len(unique_srcs))) as pool:
+            futures = {src: pool.submit(_fetch_image, src) for src in unique_srcs}
+
+        data_uris: Dict[str, str] = {}
+        for src, future in futures.items():
+            try:
+                fname, raw = future.result()
+                mime = _guess_mime(fname)
+                b64 = base64.b64encode(raw).decode('ascii')
+                data_uris[src] = f'data:{mime};base64,{b64}'
+            except Exception as e:
+                logger.warning(f"图片内联失败，保留原链接 {src}: {e}")
+
+        # 按原位置回填，失败的图片保留原链接
+        for img in targets:
+            uri = data_uris.get(img['src'])
+            if uri:
+                img['src'] = uri
+
+    cleaned = str(soup)
+    # 纯文本（节省 token、避免标签干扰）
+    return cleaned, soup.get_text(separator='\n', strip=True)
 
 
 async def _handle_article(article_id: str, source_url: str) -> Dict[str, Any]:
@@ -92,8 +112,7 @@ async def _handle_article(article_id: str, source_url: str) -> Dict[str, Any]:
     article = await scraper.scrape(source_url)
 
     if getattr(article, 'content_html', None):
-        html = _clean_html(article.content_html)
-        text = _html_to_text(html)
+        html, text = await asyncio.to_thread(_clean_html, article.content_html)
     else:
         html = f"<p>{article.content}</p>"
         text = article.content
@@ -111,7 +130,7 @@ async def _handle_article(article_id: str, source_url: str) -> Dict[str, Any]:
 async def _handle_youtube(article_id: str, source_url: str) -> Dict[str, Any]:
     from youtube_transcript_api import YouTubeTranscriptApi
 
-    m = re.search(r"(?:v=|youtu\.be/)([^&\s]+)", source_url)
+    m = _YOUTUBE_ID_RE.search(source_url)
     if not m:
         raise ValueError("无法解析 YouTube 视频 ID")
     video_id = m.group(1)
@@ -5,9 +5,14 @@ from typing import List, Tuple
 import requests
 from utils.logger import logger
 from utils.config import config
+from utils.http import get_session
 from utils.retry import retry_with_backoff
 
 
+# download_to_bytes 与 LLM / Storage 调用共用连接池，并发下载时同一图床复用 TCP/TLS 连接
+_session = get_session()
+
+
 class ImageDownloader:
     """图片下载器"""
 
@@ -147,6 +152,22 @@ class ImageDownloader:
 from typing import Optional
 from urllib.parse import urlparse
 
+# 单张内联图片上限；微信正文图通常 < 2MB，超限多为异常资源
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+
+def _sniff_image_ext(data: bytes) -> Optional[str]:
+    """按文件头魔数识别常见图片格式，无法识别返回 None"""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if data.startswith(b'GIF8'):
+        return '.gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
 
 def download_to_bytes(
     url: str,
@@ -156,6 +177,7 @@ def download_to_bytes(
     """下载图片到内存。返回 (建议文件名, bytes)。
 
     建议文件名：URL 路径末段；若无扩展名，根据 Content-Type 推断。
+    流式读取，超过 MAX_IMAGE_BYTES 立即中止，避免异常大图撑爆内存。
     """
     headers = {
         "User-Agent": (
@@ -166,17 +188,36 @@ def download_to_bytes(
     if referer:
         headers["Referer"] = referer
 
-    resp = requests.get(url, headers=headers, timeout=timeout)
-    resp.raise_for_status()
+    resp = _session.get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        resp.raise_for_status()
+
+        declared = int(resp.headers.get('Content-Length') or 0)
+        if declared > MAX_IMAGE_BYTES:
+            raise ValueError(f"图片过大 ({declared} bytes > {MAX_IMAGE_BYTES}): {url}")
+
+        chunks = []
+        received = 0
+        for chunk in resp.iter_content(chunk_size=65536):
+            received += len(chunk)
+            if received > MAX_IMAGE_BYTES:
+                raise ValueError(f"图片过大 (> {MAX_IMAGE_BYTES} bytes): {url}")
+            chunks.append(chunk)
+    finally:
+        resp.close()
 
     parsed = urlparse(url)
     base = parsed.path.rsplit('/', 1)[-1] or hashlib.md5(url.encode()).hexdigest()[:12]
+    data = b''.join(chunks)
     if '.' not in base:
-        ct = resp.headers.get('Content-Type', '').split(';')[0].strip()
-        ext = {
-            'image/jpeg': '.jpg', 'image/png': '.png',
-            'image/gif': '.gif',  'image/webp': '.webp',
-        }.get(ct, '.jpg')
+        # 优先按文件头魔数判断，CDN 的 Content-Type 常见误标（如 octet-stream）
+        ext = _sniff_image_ext(data)
+        if not ext:
+            ct = resp.headers.get('Content-Type', '').split(';')[0].strip()
+            ext = {
+                'image/jpeg': '.jpg', 'image/png': '.png',
+                'image/gif': '.gif',  'image/webp': '.webp',
+            }.get(ct, '.jpg')
         base += ext
 
-    return base, resp.content
+    return base, data
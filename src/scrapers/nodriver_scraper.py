@@ -116,7 +116,7 @@ class NodriverScraper:
 
         # Jina Reader 返回 Markdown 格式
         # 解析标题（通常是第一行 # 开头）
-        lines = content.strip().split('\n')
+        lines = content.strip().splitlines()
         title = "未知标题"
         content_start = 0
 
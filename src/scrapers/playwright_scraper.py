@@ -18,6 +18,16 @@ from utils.logger import logger
 from utils.retry import async_retry_with_backoff
 
 
+# 飞书中携带正文文字的块类型（提取纯文本用），frozenset 常数时间判定
+_FEISHU_TEXT_TYPES = frozenset({
+    'text', 'quote', 'bullet', 'ordered', 'code',
+    *(f'heading{i}' for i in range(1, 10)),
+})
+
+# HTML 转义映射，_escape_html 单次 translate 完成
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+
 class ArticleData:
     """文章数据模型"""
 
@@ -53,6 +63,9 @@ class ArticleData:
 class PlaywrightScraper:
     """Playwright网页抓取器 - 支持微信公众号"""
 
+    # 飞书图片并发下载数（同一浏览器上下文内共享 cookies）
+    FEISHU_IMAGE_CONCURRENCY = 6
+
     def __init__(self, headless: bool = True):
         """
         初始化抓取器
@@ -274,24 +287,32 @@ class PlaywrightScraper:
         MIN_HEIGHT = 80  # CSS渲染高度低于此值视为装饰性图片（如分隔线）
 
         images = []
+        seen = set()
         try:
-            img_elements = await page.query_selector_all("#js_content img")
-            for img in img_elements:
-                # 微信图片通常在data-src属性
-                src = await img.get_attribute("data-src")
-                if not src:
-                    src = await img.get_attribute("src")
-
+            # 一次 evaluate 取回所有图片的 src 与渲染高度，避免每张图 3 次 CDP 往返
+            # 微信图片通常在data-src属性
+            img_infos = await page.eval_on_selector_all(
+                "#js_content img",
+                """els => els.map(el => ({
+                    src: el.getAttribute('data-src') || el.getAttribute('src') || '',
+                    height: el.height || 0,
+                }))""",
+            )
+            for info in img_infos:
+                src = info['src']
                 if src and src.startswith("http"):
                     # 过滤微信图片域名
                     if 'mmbiz.qpic.cn' in src or 'mmbiz.qlogo.cn' in src:
                         # 通过CSS渲染尺寸过滤装饰性小图（分隔线等）
                         # 注：WeChat懒加载导致naturalWidth不可靠，用CSS渲染尺寸更准确
-                        rendered_h = await img.evaluate("el => el.height || 0")
+                        rendered_h = info['height']
                         if 0 < rendered_h < MIN_HEIGHT:
                             logger.debug(f"Skipping decorative image (rendered h={rendered_h}px): {src[:60]}...")
                             continue
-                        images.append(src)
+                        # 同一图片（分割线、二维码等）可能多次出现，只保留首次
+                        if src not in seen:
+                            seen.add(src)
+                            images.append(src)
 
             logger.info(f"Found {len(images)} WeChat images")
         except Exception as e:
@@ -352,17 +373,18 @@ class PlaywrightScraper:
 
     def _extract_images_from_html(self, html: str) -> List[str]:
         """从 HTML 内容中提取图片 URL（支持 img 和 trafilatura 的 graphic 标签）"""
-        from bs4 import BeautifulSoup
+        from bs4 import BeautifulSoup, SoupStrainer
 
         images = []
-        soup = BeautifulSoup(html, 'lxml')
+        # 只需要图片标签：SoupStrainer 让解析阶段直接跳过其余节点
+        soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer(['img', 'graphic']))
         for img in soup.find_all(['img', 'graphic']):
             src = img.get('src') or img.get('data-src')
             if src and src.startswith('http'):
                 url_lower = src.lower()
                 if not any(kw in url_lower for kw in ['icon', 'logo', 'avatar', 'emoji']):
                     images.append(src)
-        return images
+        return list(dict.fromkeys(images))
 
     async def _extract_title(self, page: Page) -> str:
         """提取标题"""
@@ -497,10 +519,11 @@ class PlaywrightScraper:
         logger.info(f"Collected {len(blocks)} blocks from Feishu document")
 
         # 提取图片URL
-        image_urls = [
+        # 按首次出现顺序去重，同一图片只下载一次
+        image_urls = list(dict.fromkeys(
             b['src'] for b in blocks
             if b['type'] == 'image' and b.get('src')
-        ]
+        ))
         logger.info(f"Found {len(image_urls)} images in Feishu document")
 
         # 用浏览器上下文下载飞书内部图片
@@ -513,13 +536,9 @@ class PlaywrightScraper:
         content_html = self._build_feishu_html(blocks)
 
         # 提取纯文本
-        text_parts = []
-        for b in blocks:
-            if b['type'] in ('text', 'heading1', 'heading2', 'heading3', 'heading4',
-                             'heading5', 'heading6', 'heading7', 'heading8', 'heading9',
-                             'quote', 'bullet', 'ordered', 'code'):
-                text_parts.append(b.get('text', ''))
-        content_text = '\n'.join(text_parts) or "内容提取失败"
+        content_text = '\n'.join(
+            b.get('text', '') for b in blocks if b['type'] in _FEISHU_TEXT_TYPES
+        ) or "内容提取失败"
 
         return ArticleData(
             url=url,
@@ -734,38 +753,35 @@ class PlaywrightScraper:
 
     @staticmethod
     def _escape_html(text: str) -> str:
-        """转义 HTML 特殊字符"""
-        return (
-            text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;')
-        )
+        """转义 HTML 特殊字符（单次 translate 完成）"""
+        return text.translate(_HTML_ESCAPE_TABLE)
 
     async def _download_feishu_images(self, page: Page, image_urls: List[str]) -> Dict[str, str]:
-        """用浏览器上下文下载飞书内部图片（携带 cookies）"""
+        """用浏览器上下文下载飞书内部图片（携带 cookies），并发请求"""
         config.ensure_directories()
         downloads_dir = config.DOWNLOADS_DIR
         local_map = {}
+        semaphore = asyncio.Semaphore(self.FEISHU_IMAGE_CONCURRENCY)
 
-        for idx, img_url in enumerate(image_urls):
+        async def _download(idx: int, img_url: str) -> None:
             try:
                 url_hash = hashlib.md5(img_url.encode()).hexdigest()[:12]
                 filename = f"feishu_img_{idx}_{url_hash}.png"
                 save_path = os.path.join(downloads_dir, filename)
 
                 # 用浏览器上下文发起请求（携带 cookies）
-                response = await page.context.request.get(img_url)
-                if response.ok:
+                async with semaphore:
+                    response = await page.context.request.get(img_url)
+                    if not response.ok:
+                        logger.warning(f"Failed to download Feishu image (HTTP {response.status}): {img_url}")
+                        return
                     body = await response.body()
-                    with open(save_path, 'wb') as f:
-                        f.write(body)
-                    local_map[img_url] = save_path
-                    logger.debug(f"Downloaded Feishu image: {filename} ({len(body)} bytes)")
-                else:
-                    logger.warning(f"Failed to download Feishu image (HTTP {response.status}): {img_url}")
+                with open(save_path, 'wb') as f:
+                    f.write(body)
+                local_map[img_url] = save_path
+                logger.debug(f"Downloaded Feishu image: {filename} ({len(body)} bytes)")
             except Exception as e:
                 logger.warning(f"Failed to download Feishu image: {img_url} - {e}")
 
+        await asyncio.gather(*(_download(idx, url) for idx, url in enumerate(image_urls)))
         return local_map
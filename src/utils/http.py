@@ -0,0 +1,27 @@
+"""共享 HTTP 会话
+
+图片下载、LLM 调用、Storage 下载共用同一个 requests.Session，
+同一 host 的请求复用 TCP/TLS 连接，省去每次调用的握手开销。
+"""
+import requests
+from requests.adapters import HTTPAdapter
+
+# 单 host 连接池上限，覆盖各处并发（正文图片 8 / 纠错 4 / PDF Vision 3）
+POOL_MAXSIZE = 8
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# 导入时即创建：首次使用可能发生在多个工作线程中，避免竞态
+_session = _build_session()
+
+
+def get_session() -> requests.Session:
+    """返回进程内共享的 requests.Session"""
+    return _session
@@ -3,11 +3,39 @@ import time
 import random
 from typing import Callable, TypeVar, Optional
 from functools import wraps
+
+import requests
+
 from .logger import logger
 
 T = TypeVar('T')
 
 
+def backoff_delay(
+    attempt: int,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    exponential_base: float = 2.0,
+    jitter: bool = True,
+) -> float:
+    """第 attempt 次（从 0 计）失败后的指数退避秒数，可选随机抖动"""
+    delay = min(base_delay * (exponential_base ** attempt), max_delay)
+    if jitter:
+        delay = delay * (0.5 + random.random())
+    return delay
+
+
+def rate_limit_delay(resp: requests.Response, attempt: int, base_delay: float) -> float:
+    """429 退避秒数：优先服务端 Retry-After；否则指数退避加随机抖动，避免并发请求同时重试"""
+    retry_after = resp.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return backoff_delay(attempt, base_delay)
+
+
 def retry_with_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
@@ -46,12 +74,7 @@ def retry_with_backoff(
                         logger.error(f"{func.__name__} failed after {max_retries} attempts: {str(e)}")
                         raise
 
-                    # 计算延迟时间
-                    delay = min(base_delay * (exponential_base ** attempt), max_delay)
-
-                    # 添加随机抖动
-                    if jitter:
-                        delay = delay * (0.5 + random.random())
+                    delay = backoff_delay(attempt, base_delay, max_delay, exponential_base, jitter)
 
                     logger.warning(
                         f"{func.__name__} attempt {attempt + 1}/{max_retries} failed: {str(e)}. "
@@ -108,10 +131,7 @@ def async_retry_with_backoff(
                         logger.error(f"{func.__name__} failed after {max_retries} attempts: {str(e)}")
                         raise
 
-                    delay = min(base_delay * (exponential_base ** attempt), max_delay)
-
-                    if jitter:
-                        delay = delay * (0.5 + random.random())
+                    delay = backoff_delay(attempt, base_delay, max_delay, exponential_base, jitter)
 
                     logger.warning(
                         f"{func.__name__} attempt {attempt + 1}/{max_retries} failed: {str(e)}. "
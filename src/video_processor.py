@@ -5,10 +5,14 @@ import json
 import os
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from utils.http import get_session
 from utils.logger import logger
+from utils.retry import rate_limit_delay, retry_with_backoff
 
 
 # ────────────────────────────────────────────────
@@ -51,17 +55,24 @@ async def _get_bilibili_cookies(url: str, cookies_file: str) -> None:
 # 字幕提取
 # ────────────────────────────────────────────────
 
+# VTT 解析在每个 cue 上执行，长视频可达数千条，正则预编译一次
+_VTT_BLOCK_SEP_RE = re.compile(r'\n\n+')
+_VTT_TS_RE = re.compile(r'(?:(\d+):)?(\d+):(\d+)\.(\d+)')
+_VTT_CUE_ID_RE = re.compile(r'^\d+$')
+_VTT_TAG_RE = re.compile(r'<[^>]+>')
+
+
 def _parse_vtt(vtt_path: str) -> List[Dict]:
     """解析 VTT 字幕文件，返回 [{start: float, text: str}]"""
     segments = []
     content = Path(vtt_path).read_text(encoding='utf-8')
-    for block in re.split(r'\n\n+', content):
+    for block in _VTT_BLOCK_SEP_RE.split(content):
         lines = block.strip().splitlines()
         ts_line = next((l for l in lines if '-->' in l), None)
         if not ts_line:
             continue
         ts_part = ts_line.split('-->')[0].strip()
-        m = re.match(r'(?:(\d+):)?(\d+):(\d+)\.(\d+)', ts_part)
+        m = _VTT_TS_RE.match(ts_part)
         if not m:
             continue
         h, mn, s, ms = (int(x or 0) for x in m.groups())
@@ -69,10 +80,10 @@ def _parse_vtt(vtt_path: str) -> List[Dict]:
         text_lines = [
             l for l in lines
             if '-->' not in l and l.strip()
-            and not re.match(r'^\d+$', l.strip())
+            and not _VTT_CUE_ID_RE.match(l.strip())
             and 'WEBVTT' not in l
         ]
-        text = re.sub(r'<[^>]+>', '', ' '.join(text_lines)).strip()
+        text = _VTT_TAG_RE.sub('', ' '.join(text_lines)).strip()
         if text:
             segments.append({'start': start, 'text': text})
     return segments
@@ -211,6 +222,9 @@ def _whisper_chunked(client: Any, audio_path: str) -> Tuple[List[Dict], str]:
 # 英文自然段分段 + 翻译
 # ────────────────────────────────────────────────
 
+_SENTENCE_END_RE = re.compile(r'[.!?。！？]$')
+
+
 def _segment_paragraphs(segments: List[Dict]) -> List[Dict]:
     """按停顿时长和句子结尾将 segments 合并成自然段落"""
     if not segments:
@@ -223,7 +237,7 @@ def _segment_paragraphs(segments: List[Dict]) -> List[Dict]:
     for i in range(1, len(segments)):
         prev, curr = segments[i - 1], segments[i]
         gap = curr['start'] - prev['start']
-        ends_sent = bool(re.search(r'[.!?。！？]$', prev['text'].strip()))
+        ends_sent = bool(_SENTENCE_END_RE.search(prev['text'].strip()))
         is_boundary = gap >= 2.0 or (ends_sent and gap >= 0.8)
 
         if is_boundary:
@@ -239,50 +253,43 @@ def _segment_paragraphs(segments: List[Dict]) -> List[Dict]:
 
 def _call_gemini_json(prompt: str, timeout: int = 60) -> Any:
     """调用 Gemini，返回解析后的 JSON 对象；429 时最多重试 2 次"""
-    import urllib.request
-    import urllib.error
     import time
     api_key = os.environ['GEMINI_API_KEY']
     url = (
         f'https://generativelanguage.googleapis.com/v1beta/models/'
         f'gemini-2.5-flash:generateContent?key={api_key}'
     )
-    body = json.dumps({
+    body = {
         'contents': [{'parts': [{'text': prompt}]}],
         'generationConfig': {'responseMimeType': 'application/json'},
-    }).encode()
-    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    }
     for attempt in range(3):
-        try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                result = json.loads(resp.read())
-            return json.loads(result['candidates'][0]['content']['parts'][0]['text'])
-        except urllib.error.HTTPError as e:
-            if e.code == 429 and attempt < 2:
-                wait = 10 * (attempt + 1)
-                logger.warning(f'Gemini 429，{wait}s 后重试（第 {attempt + 1} 次）')
-                time.sleep(wait)
-            else:
-                raise
+        resp = get_session().post(url, json=body, timeout=timeout)
+        if resp.status_code == 429 and attempt < 2:
+            wait = rate_limit_delay(resp, attempt, 10)
+            logger.warning(f'Gemini 429，{wait:.1f}s 后重试（第 {attempt + 1} 次）')
+            time.sleep(wait)
+            continue
+        resp.raise_for_status()
+        result = resp.json()
+        return json.loads(result['candidates'][0]['content']['parts'][0]['text'])
 
 
 def _call_minimax_json(prompt: str, timeout: int = 60) -> Any:
     """调用 MiniMax（OpenAI 兼容格式），返回解析后的 JSON 对象"""
-    import urllib.request
     api_key = os.environ['MINIMAX_API_KEY']
     model = os.environ.get('MINIMAX_MODEL', 'MiniMax-M2')
     url = 'https://api.minimax.chat/v1/chat/completions'
-    body = json.dumps({
+    body = {
         'model': model,
         'messages': [{'role': 'user', 'content': prompt}],
         'temperature': 0.3,
-    }).encode()
-    req = urllib.request.Request(url, data=body, headers={
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {api_key}',
-    })
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        result = json.loads(resp.read())
+    }
+    resp = get_session().post(
+        url, json=body, headers={'Authorization': f'Bearer {api_key}'}, timeout=timeout
+    )
+    resp.raise_for_status()
+    result = resp.json()
     content = result['choices'][0]['message']['content']
     if not content or not content.strip():
         raise ValueError('MiniMax 返回空内容')
@@ -291,21 +298,19 @@ def _call_minimax_json(prompt: str, timeout: int = 60) -> Any:
 
 def _call_groq_json(prompt: str, timeout: int = 60) -> Any:
     """调用 Groq（OpenAI 兼容），返回解析后的 JSON 对象"""
-    import urllib.request
     api_key = os.environ['GROQ_API_KEY']
     url = 'https://api.groq.com/openai/v1/chat/completions'
-    body = json.dumps({
+    body = {
         'model': 'llama-3.3-70b-versatile',
         'messages': [{'role': 'user', 'content': prompt}],
         'temperature': 0.3,
         'response_format': {'type': 'json_object'},
-    }).encode()
-    req = urllib.request.Request(url, data=body, headers={
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {api_key}',
-    })
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        result = json.loads(resp.read())
+    }
+    resp = get_session().post(
+        url, json=body, headers={'Authorization': f'Bearer {api_key}'}, timeout=timeout
+    )
+    resp.raise_for_status()
+    result = resp.json()
     content = result['choices'][0]['message']['content']
     if not content or not content.strip():
         raise ValueError('Groq 返回空内容')
@@ -335,18 +340,58 @@ def _llm_json(prompt: str, timeout: int = 60) -> Any:
     raise RuntimeError(f'所有 LLM 均失败: {"; ".join(errors)}')
 
 
+_TRANSLATE_PROMPT = (
+    'Translate the following English paragraphs to Chinese. '
+    'Return a JSON array of strings, one translation per paragraph, preserving order. '
+    'Output only the JSON array.\n\n'
+)
+
+
+_TRANSLATE_CHAR_BUDGET = 6000  # 单次翻译请求的原文字符预算
+_TRANSLATE_WORKERS = 4
+
+
+def _translate_chunk(texts: List[str]) -> List[str]:
+    """翻译一段连续段落；返回与输入等长的译文（缺失补空串）"""
+    result = _llm_json(_TRANSLATE_PROMPT + json.dumps(texts, ensure_ascii=False), timeout=90)
+    if not isinstance(result, list):
+        return [''] * len(texts)
+    out = [str(x) for x in result[:len(texts)]]
+    return out + [''] * (len(texts) - len(out))
+
+
 def _translate_paragraphs(paragraphs: List[Dict]) -> List[str]:
+    """按字符预算切块并发翻译，再按原顺序拼接
+
+    长视频/长文档整篇一次性翻译时输出极长、耗时与整篇长度成正比，且容易截断错位；
+    切块后耗时约为最慢一块，单块失败只影响该块（译文留空）。
+    """
     texts = [' '.join(p['texts']) for p in paragraphs]
-    prompt = (
-        'Translate the following English paragraphs to Chinese. '
-        'Return a JSON array of strings, one translation per paragraph, preserving order. '
-        'Output only the JSON array.\n\n'
-        + json.dumps(texts, ensure_ascii=False)
-    )
-    result = _llm_json(prompt, timeout=90)
-    if not isinstance(result, list):
-        return [''] * len(paragraphs)
-    return result
+    chunks: List[List[str]] = []
+    cur: List[str] = []
+    cur_chars = 0
+    for t in texts:
+        if cur and cur_chars + len(t) > _TRANSLATE_CHAR_BUDGET:
+            chunks.append(cur)
+            cur, cur_chars = [], 0
+        cur.append(t)
+        cur_chars += len(t)
+    if cur:
+        chunks.append(cur)
+    if not chunks:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(_TRANSLATE_WORKERS, len(chunks))) as pool:
+        futures = [pool.submit(_translate_chunk, chunk) for chunk in chunks]
+
+    translations: List[str] = []
+    for chunk, future in zip(chunks, futures):
+        try:
+            translations.extend(future.result())
+        except Exception as e:
+            logger.warning(f'段落翻译分块失败（{len(chunk)} 段留空）: {e}')
+            translations.extend([''] * len(chunk))
+    return translations
 
 
 # ────────────────────────────────────────────────
@@ -374,32 +419,56 @@ def _load_glossary() -> Dict:
     return _GLOSSARY_CACHE
 
 
-def _correct_batch(texts: List[str], glossary: Dict) -> List[str]:
-    """对一批转录文本做上下文专有名词纠错，返回等长等序数组"""
-    hints = '\n'.join(f'- {w} → {r}' for w, r in glossary['corrections'].items())
-    prompt = (
-        'You are fixing speech-to-text (ASR) transcription errors. '
-        'The audio is about AI and software development. '
-        'Below is a list of proper nouns that are frequently mis-transcribed.\n\n'
-        'Canonical proper nouns:\n' + ', '.join(glossary['terms']) + '\n\n'
+_CORRECT_PROMPT_INTRO = (
+    'You are fixing speech-to-text (ASR) transcription errors. '
+    'The audio is about AI and software development. '
+    'Below is a list of proper nouns that are frequently mis-transcribed.\n\n'
+)
+_CORRECT_PROMPT_RULES = (
+    'For each input line, ONLY restore mis-transcribed proper nouns from the list above '
+    'when the surrounding context clearly refers to that AI/dev tool. '
+    'Do NOT change anything else: keep wording, punctuation, casing and language identical. '
+    'When unsure, leave the line unchanged. '
+    'Return a JSON array of strings with EXACTLY the same length and order as the input. '
+    'Output only the JSON array.\n\n'
+)
+
+
+@lru_cache(maxsize=4)
+def _correct_prompt_head(terms: Tuple[str, ...], corrections: Tuple[Tuple[str, str], ...]) -> str:
+    """纠错 prompt 中只依赖术语表的部分；术语表进程内不变，各批次共用同一份"""
+    hints = '\n'.join(f'- {w} → {r}' for w, r in corrections)
+    return (
+        _CORRECT_PROMPT_INTRO
+        + 'Canonical proper nouns:\n' + ', '.join(terms) + '\n\n'
         + ('Common mishearing → correct form (hints only, still judge by context):\n'
            + hints + '\n\n' if hints else '')
-        + 'For each input line, ONLY restore mis-transcribed proper nouns from the list above '
-        'when the surrounding context clearly refers to that AI/dev tool. '
-        'Do NOT change anything else: keep wording, punctuation, casing and language identical. '
-        'When unsure, leave the line unchanged. '
-        'Return a JSON array of strings with EXACTLY the same length and order as the input. '
-        'Output only the JSON array.\n\n'
-        + json.dumps(texts, ensure_ascii=False)
+        + _CORRECT_PROMPT_RULES
+    )
+
+
+def _correct_batch(texts: List[str], glossary: Dict) -> List[str]:
+    """对一批转录文本做上下文专有名词纠错，返回等长等序数组"""
+    head = _correct_prompt_head(
+        tuple(glossary['terms']), tuple(glossary['corrections'].items())
     )
+    prompt = head + json.dumps(texts, ensure_ascii=False)
     result = _llm_json(prompt, timeout=90)
     if not isinstance(result, list) or len(result) != len(texts):
         raise ValueError(f'纠错返回长度不符：期望 {len(texts)}，实际 {result if not isinstance(result, list) else len(result)}')
     return [str(x) for x in result]
 
 
+_CORRECT_WORKERS = 4  # 纠错批次并发上限，兼顾 Gemini 免费额度的 RPM
+_CORRECT_RETRIES = 3  # 失败批次补做轮的最多尝试次数
+_CORRECT_RETRY_DELAY = 5  # 补做轮指数退避的基础秒数
+
+
 def _correct_transcript(segments: List[Dict]) -> List[Dict]:
-    """在拿到 segments 后整体纠错，原地修改 text；任一批失败则保留该批原文（不丢数据）"""
+    """在拿到 segments 后整体纠错，原地修改 text；失败批次按指数退避补做，仍失败则保留该批原文（不丢数据）
+
+    各批次互不依赖，并发提交，耗时由 批数×RTT 降为约 ⌈批数/并发⌉×RTT。
+    """
     glossary = _load_glossary()
     if not glossary['terms'] and not glossary['corrections']:
         return segments
@@ -418,20 +487,42 @@ def _correct_transcript(segments: List[Dict]) -> List[Dict]:
         cur_chars += ln
     if cur:
         batches.append(cur)
+    if not batches:
+        return segments
 
     fixed_count = 0
-    for batch in batches:
-        texts = [segments[i]['text'] for i in batch]
-        try:
-            corrected = _correct_batch(texts, glossary)
-        except Exception as e:
-            logger.warning(f'专有名词纠错批次失败，保留原文: {e}')
-            continue
+
+    def _apply(batch: List[int], corrected: List[str]) -> None:
+        nonlocal fixed_count
         for i, new_text in zip(batch, corrected):
             if new_text != segments[i]['text']:
                 fixed_count += 1
             segments[i]['text'] = new_text
 
+    failed_batches: List[List[int]] = []
+    with ThreadPoolExecutor(max_workers=min(_CORRECT_WORKERS, len(batches))) as pool:
+        futures = [
+            pool.submit(_correct_batch, [segments[i]['text'] for i in batch], glossary)
+            for batch in batches
+        ]
+    for batch, future in zip(batches, futures):
+        try:
+            _apply(batch, future.result())
+        except Exception as e:
+            logger.warning(f'专有名词纠错批次失败，稍后重试: {e}')
+            failed_batches.append(batch)
+
+    # 失败批次（多为瞬时 5xx / 超时 / 429）串行补做，指数退避加抖动，仍失败才保留原文
+    @retry_with_backoff(max_retries=_CORRECT_RETRIES, base_delay=_CORRECT_RETRY_DELAY)
+    def _retry_batch(batch: List[int]) -> List[str]:
+        return _correct_batch([segments[i]['text'] for i in batch], glossary)
+
+    for batch in failed_batches:
+        try:
+            _apply(batch, _retry_batch(batch))
+        except Exception as e:
+            logger.warning(f'专有名词纠错批次重试仍失败，保留原文: {e}')
+
     logger.info(f'专有名词纠错完成：{len(batches)} 批，修正 {fixed_count} 段')
     return segments
 
@@ -440,19 +531,22 @@ def _correct_transcript(segments: List[Dict]) -> List[Dict]:
 # 关键帧识别
 # ────────────────────────────────────────────────
 
+_KEYFRAME_PROMPT = (
+    'You are analyzing a video transcript (may be in Chinese or English). '
+    'Identify 3 to 7 moments that would benefit from a screenshot. '
+    'Good candidates: diagrams, charts, code on screen, terminal output, UI demos, '
+    'side-by-side comparisons, data/results being shown, or any moment where the '
+    'speaker says "look at this", "watch here", "let\'s see", or equivalent in Chinese '
+    '(e.g. "你看", "注意看", "咱们看看", "走，看效果"). '
+    'Only return empty list for pure audio podcasts with absolutely no visual content.\n\n'
+    'Return JSON: {"keyframes": [{"timestamp_seconds": <number>, "reason": "<why>"}]}\n\n'
+    'Transcript:\n'
+)
+
+
 def _identify_keyframes(transcript_text: str, video_duration_sec: float = 0) -> List[Dict]:
     """LLM 从转录文本识别值得截图的时刻；LLM 失败或返回空时均匀采样兜底"""
-    prompt = (
-        'You are analyzing a video transcript (may be in Chinese or English). '
-        'Identify 3 to 7 moments that would benefit from a screenshot. '
-        'Good candidates: diagrams, charts, code on screen, terminal output, UI demos, '
-        'side-by-side comparisons, data/results being shown, or any moment where the '
-        'speaker says "look at this", "watch here", "let\'s see", or equivalent in Chinese '
-        '(e.g. "你看", "注意看", "咱们看看", "走，看效果"). '
-        'Only return empty list for pure audio podcasts with absolutely no visual content.\n\n'
-        'Return JSON: {"keyframes": [{"timestamp_seconds": <number>, "reason": "<why>"}]}\n\n'
-        'Transcript:\n' + transcript_text[:12000]
-    )
+    prompt = _KEYFRAME_PROMPT + transcript_text[:12000]
     try:
         data = _llm_json(prompt, timeout=90)
         kfs = data.get('keyframes', [])
@@ -480,7 +574,8 @@ def _identify_keyframes(transcript_text: str, video_duration_sec: float = 0) ->
 # 视频下载 + 帧提取 + Vision 选帧
 # ────────────────────────────────────────────────
 
-def _download_video(url: str, tmpdir: str, cookies_file: Optional[str]) -> str:
+async def _download_video(url: str, tmpdir: str, cookies_file: Optional[str]) -> str:
+    """异步子进程下载视频；超时或任务被取消时结束 yt-dlp 进程"""
     out_path = os.path.join(tmpdir, 'video.mp4')
     cmd = [
         'yt-dlp',
@@ -492,7 +587,18 @@ def _download_video(url: str, tmpdir: str, cookies_file: Optional[str]) -> str:
     if cookies_file:
         cmd += ['--cookies', cookies_file]
     cmd.append(url)
-    subprocess.run(cmd, check=True, capture_output=True, timeout=600)
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(proc.communicate(), timeout=600)
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
     logger.info(f'视频下载完成：{os.path.getsize(out_path) // (1024*1024)}MB')
     return out_path
 
@@ -513,6 +619,41 @@ def _extract_candidate_frames(
     return sorted(str(p) for p in Path(frame_dir).glob('frame_*.jpg'))
 
 
+_KEYFRAME_WORKERS = 3  # 关键帧并发数：每个关键帧 1 次 ffmpeg + 1 次 Vision 调用
+
+
+def _select_keyframe_images(
+    video_path: str, keyframes: List[Dict], paragraphs: List[Dict], tmpdir: str
+) -> List[Tuple[float, str]]:
+    """并发处理各关键帧（抽候选帧 + Vision 选帧），按关键帧顺序返回 [(时间点, 选中帧路径)]
+
+    各关键帧写入独立的 frames_{idx} 目录，互不干扰；单个失败只跳过该关键帧。
+    """
+    def _process(kf_idx: int, kf: Dict) -> Optional[Tuple[float, str]]:
+        t = float(kf['timestamp_seconds'])
+        candidate_frames = _extract_candidate_frames(video_path, t, tmpdir, kf_idx)
+        if not candidate_frames:
+            return None
+        nearest_para = min(paragraphs, key=lambda p: abs(p['start'] - t))
+        snippet = ' '.join(nearest_para['texts'])[:200]
+        best_frame = _select_best_frame(candidate_frames, snippet)
+        return (t, best_frame) if best_frame else None
+
+    with ThreadPoolExecutor(max_workers=min(_KEYFRAME_WORKERS, len(keyframes))) as pool:
+        futures = [pool.submit(_process, i, kf) for i, kf in enumerate(keyframes)]
+
+    selected: List[Tuple[float, str]] = []
+    for kf_idx, future in enumerate(futures):
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.warning(f'关键帧 {kf_idx} 处理失败（跳过）: {e}')
+            continue
+        if result:
+            selected.append(result)
+    return selected
+
+
 def _select_best_frame(frame_paths: List[str], transcript_snippet: str) -> Optional[str]:
     """从候选帧选信息量最大的一帧，依次尝试 Gemini Vision → MiniMax Vision"""
     if not frame_paths:
@@ -532,7 +673,6 @@ def _select_best_frame(frame_paths: List[str], transcript_snippet: str) -> Optio
 
     if os.environ.get('GEMINI_API_KEY'):
         try:
-            import urllib.request
             parts: List[Dict] = []
             for b64 in frame_b64:
                 parts.append({'inline_data': {'mime_type': 'image/jpeg', 'data': b64}})
@@ -542,13 +682,13 @@ def _select_best_frame(frame_paths: List[str], transcript_snippet: str) -> Optio
                 f'https://generativelanguage.googleapis.com/v1beta/models/'
                 f'gemini-2.5-flash:generateContent?key={api_key}'
             )
-            body = json.dumps({
+            body = {
                 'contents': [{'parts': parts}],
                 'generationConfig': {'responseMimeType': 'application/json'},
-            }).encode()
-            req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                result = json.loads(resp.read())
+            }
+            resp = get_session().post(url, json=body, timeout=60)
+            resp.raise_for_status()
+            result = resp.json()
             raw = result['candidates'][0]['content']['parts'][0]['text']
             sel = json.loads(raw).get('selected_index', 0)
         except Exception as e:
@@ -557,7 +697,6 @@ def _select_best_frame(frame_paths: List[str], transcript_snippet: str) -> Optio
 
     if sel is None and os.environ.get('MINIMAX_API_KEY'):
         try:
-            import urllib.request
             content_parts: List[Dict] = []
             for b64 in frame_b64:
                 content_parts.append({
@@ -566,20 +705,18 @@ def _select_best_frame(frame_paths: List[str], transcript_snippet: str) -> Optio
                 })
             content_parts.append({'type': 'text', 'text': prompt_text})
             model = os.environ.get('MINIMAX_MODEL', 'MiniMax-M2')
-            body = json.dumps({
+            body = {
                 'model': model,
                 'messages': [{'role': 'user', 'content': content_parts}],
-            }).encode()
-            req = urllib.request.Request(
+            }
+            resp = get_session().post(
                 'https://api.minimax.chat/v1/chat/completions',
-                data=body,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {os.environ["MINIMAX_API_KEY"]}',
-                },
+                json=body,
+                headers={'Authorization': f'Bearer {os.environ["MINIMAX_API_KEY"]}'},
+                timeout=60,
             )
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                result = json.loads(resp.read())
+            resp.raise_for_status()
+            result = resp.json()
             raw = result['choices'][0]['message']['content']
             sel = json.loads(raw).get('selected_index', 0)
         except Exception as e:
@@ -733,6 +870,7 @@ async def handle_video(
     save_video = os.environ.get('SAVE_VIDEO', '').lower() in ('true', '1', 'yes')
     tmpdir = tempfile.mkdtemp(prefix='rocvideo_')
     cookies_file: Optional[str] = None
+    video_task: Optional[asyncio.Task] = None
 
     try:
         # 1. B站：Playwright 获取 cookies
@@ -743,13 +881,16 @@ async def handle_video(
         # 2. 字幕提取
         segments: List[Dict] = []
         lang: Optional[str] = None
-        segments, lang = _extract_subtitles(source_url, tmpdir, cookies_file, is_bilibili)
+        # 阻塞步骤（yt-dlp / Whisper / LLM）均经 asyncio.to_thread 执行，不占用事件循环
+        segments, lang = await asyncio.to_thread(
+            _extract_subtitles, source_url, tmpdir, cookies_file, is_bilibili
+        )
 
         # 3. 无字幕时的转录路径
         if not segments:
             logger.info('无可用字幕，启动 Whisper 转录')
-            audio_path = _download_audio(source_url, tmpdir, cookies_file)
-            segments, lang = _transcribe_audio(audio_path)
+            audio_path = await asyncio.to_thread(_download_audio, source_url, tmpdir, cookies_file)
+            segments, lang = await asyncio.to_thread(_transcribe_audio, audio_path)
 
         if not segments:
             return {
@@ -760,22 +901,31 @@ async def handle_video(
 
         lang = lang or 'zh'
 
+        # 视频下载（yt-dlp，分钟级）只依赖 source_url，后台进行，与下面纠错/翻译/关键帧的 LLM 调用并行
+        video_task = asyncio.create_task(_download_video(source_url, tmpdir, cookies_file))
+
         # 3.5 专有名词纠错（还原 ASR 误识别，贯穿后续段落/关键帧/翻译/Markdown）
-        segments = _correct_transcript(segments)
+        segments = await asyncio.to_thread(_correct_transcript, segments)
 
         # 4. 段落化
         paragraphs = _segment_paragraphs(segments)
 
-        # 5. 英文视频：翻译
+        # 5/6. 英文视频翻译 与 关键帧识别 互不依赖，两次 LLM 调用并行
+        full_text = ' '.join(s['text'] for s in segments)
+        video_duration_sec = segments[-1]['start'] if segments else 0
         translations: Optional[List[str]] = None
+        keyframes_call = asyncio.to_thread(_identify_keyframes, full_text, video_duration_sec)
         if lang == 'en':
             logger.info('英文视频，开始段落翻译')
-            translations = _translate_paragraphs(paragraphs)
+            translations, keyframes = await asyncio.gather(
+                asyncio.to_thread(_translate_paragraphs, paragraphs), keyframes_call
+            )
+        else:
+            keyframes = await keyframes_call
 
-        # 6. 关键帧识别
-        full_text = ' '.join(s['text'] for s in segments)
-        video_duration_sec = segments[-1]['start'] if segments else 0
-        keyframes = _identify_keyframes(full_text, video_duration_sec)
+        if not keyframes and not save_video:
+            # 视频不会被用到：结束后台下载
+            video_task.cancel()
 
         # 7. 视频下载 + 帧提取 + Vision 选帧
         article_images: Dict[str, str] = {}
@@ -785,32 +935,20 @@ async def handle_video(
         if keyframes:
             logger.info(f'开始提取 {len(keyframes)} 个关键帧')
             try:
-                if downloaded_video_path is None:
-                    downloaded_video_path = _download_video(source_url, tmpdir, cookies_file)
-                for kf_idx, kf in enumerate(keyframes):
-                    t = float(kf['timestamp_seconds'])
-                    try:
-                        candidate_frames = _extract_candidate_frames(
-                            downloaded_video_path, t, tmpdir, kf_idx
-                        )
-                        if not candidate_frames:
-                            continue
-                        nearest_para = min(paragraphs, key=lambda p: abs(p['start'] - t))
-                        snippet = ' '.join(nearest_para['texts'])[:200]
-                        best_frame = _select_best_frame(candidate_frames, snippet)
-                        if not best_frame:
-                            continue
-                        frame_name = f'frame_{int(t)}s.jpg'
-                        article_images[frame_name] = base64.b64encode(
-                            Path(best_frame).read_bytes()
-                        ).decode()
-                        para_idx = min(
-                            range(len(paragraphs)),
-                            key=lambda i: abs(paragraphs[i]['start'] - t),
-                        )
-                        keyframe_para_map[para_idx] = frame_name
-                    except Exception as e:
-                        logger.warning(f'关键帧 {kf_idx} 处理失败（跳过）: {e}')
+                downloaded_video_path = await video_task
+                selected = await asyncio.to_thread(
+                    _select_keyframe_images, downloaded_video_path, keyframes, paragraphs, tmpdir
+                )
+                for t, best_frame in selected:
+                    frame_name = f'frame_{int(t)}s.jpg'
+                    article_images[frame_name] = base64.b64encode(
+                        Path(best_frame).read_bytes()
+                    ).decode()
+                    para_idx = min(
+                        range(len(paragraphs)),
+                        key=lambda i: abs(paragraphs[i]['start'] - t),
+                    )
+                    keyframe_para_map[para_idx] = frame_name
             except Exception as e:
                 logger.warning(f'视频下载/帧提取失败，跳过关键帧: {e}')
 
@@ -825,9 +963,13 @@ async def handle_video(
             try:
                 source_for_save = downloaded_video_path
                 if source_for_save is None:
-                    source_for_save = _download_video(source_url, tmpdir, cookies_file)
-                video_storage_path = _compress_and_upload_video(
-                    source_for_save, article_id, tmpdir
+                    # 关键帧阶段未取用或下载失败：先取后台结果，失败再重试一次
+                    try:
+                        source_for_save = await video_task
+                    except Exception:
+                        source_for_save = await _download_video(source_url, tmpdir, cookies_file)
+                video_storage_path = await asyncio.to_thread(
+                    _compress_and_upload_video, source_for_save, article_id, tmpdir
                 )
                 logger.info(f'视频保存完成: {video_storage_path}')
             except Exception as e:
@@ -850,4 +992,8 @@ async def handle_video(
 
     finally:
         import shutil
+        # 提前返回（含异常路径）时后台下载可能仍在写 tmpdir：取消并等其进程退出，再清理
+        if video_task is not None:
+            video_task.cancel()
+            await asyncio.gather(video_task, return_exceptions=True)
         shutil.rmtree(tmpdir, ignore_errors=True)
@@ -0,0 +1,95 @@
+import base64
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import document_processor
+from document_processor import _esc, _extract_document, _extract_text_file
+
+
+def test_extract_text_file_handles_crlf_paragraphs():
+    """Windows 换行的 txt 也要按空行分段，标题取首行。"""
+    raw = '# 标题\r\n\r\n第一段\r\n续行\r\n\r\n第二段\r\n'.encode('utf-8')
+    html, text, title = _extract_text_file(raw)
+    assert title == '标题'
+    assert html.count('<p>') == 3
+    assert '<p>第二段</p>' in html
+    assert text == raw.decode('utf-8')
+
+
+def test_extract_document_dispatches_by_extension():
+    html, text, title = _extract_document('# 笔记\n\n正文'.encode('utf-8'), 'md')
+    assert title == '笔记'
+    assert '<p>正文</p>' in html
+
+    with pytest.raises(ValueError):
+        _extract_document(b'', 'xls')
+
+
+def test_esc_escapes_in_single_pass():
+    # & 不能被二次转义
+    assert _esc('a < b && c > "d"') == 'a &lt; b &amp;&amp; c &gt; "d"'
+    assert _esc('&lt;') == '&amp;lt;'
+
+
+class _FakePixmap:
+    def __init__(self, no):
+        self.no = no
+
+    def tobytes(self, fmt):
+        return f'page{self.no}'.encode()
+
+
+class _FakePage:
+    def __init__(self, no, on_render):
+        self.no = no
+        self._on_render = on_render
+
+    def get_pixmap(self, dpi):
+        self._on_render()
+        return _FakePixmap(self.no)
+
+    def get_text(self):
+        return f'text{self.no}'
+
+
+def test_extract_pdf_vision_bounds_in_flight_and_keeps_page_order(monkeypatch):
+    """每批渲染前在途 Vision 调用不超过并发上限；结果按页序组装，失败批次降级为页面文字。"""
+    lock = threading.Lock()
+    active = 0
+    active_at_render = []
+
+    def on_render():
+        with lock:
+            active_at_render.append(active)
+
+    pages = [_FakePage(i, on_render) for i in range(12)]   # 5 + 5 + 2 页，共 3 批
+    doc = MagicMock(metadata={'title': 'T'}, page_count=len(pages))
+    doc.__iter__.return_value = iter(pages)
+    monkeypatch.setitem(sys.modules, 'fitz', MagicMock(open=MagicMock(return_value=doc)))
+    monkeypatch.setattr(document_processor, '_VISION_WORKERS', 2)
+
+    def fake_vision(prompt, images, timeout):
+        nonlocal active
+        with lock:
+            active += 1
+        try:
+            first = base64.b64decode(images[0][1]).decode()
+            time.sleep(0.05 if first == 'page0' else 0.01)
+            if first == 'page5':
+                raise RuntimeError('429')
+            return f'<p>{first}</p>'
+        finally:
+            with lock:
+                active -= 1
+
+    with patch.object(document_processor, '_call_gemini_vision', side_effect=fake_vision):
+        html, text, title = document_processor._extract_pdf_vision(b'%PDF')
+
+    assert title == 'T'
+    assert html.split('\n') == ['<p>page0</p>'] + [f'<p>text{i}</p>' for i in range(5, 10)] + ['<p>page10</p>']
+    assert max(active_at_render) < 2
+    doc.close.assert_called_once()
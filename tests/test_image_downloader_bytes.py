@@ -6,11 +6,11 @@ from scrapers.image_downloader import download_to_bytes
 def test_download_to_bytes_returns_filename_and_bytes():
     fake_resp = MagicMock()
     fake_resp.status_code = 200
-    fake_resp.content = b'fake-image-bytes'
+    fake_resp.iter_content.return_value = [b'fake-', b'image-bytes']
     fake_resp.headers = {'Content-Type': 'image/jpeg'}
     fake_resp.raise_for_status.return_value = None
 
-    with patch('scrapers.image_downloader.requests.get', return_value=fake_resp) as g:
+    with patch('scrapers.image_downloader._session.get', return_value=fake_resp) as g:
         filename, data = download_to_bytes(
             'https://mmbiz.qpic.cn/abc.jpg',
             referer='https://mp.weixin.qq.com/'
@@ -24,10 +24,33 @@ def test_download_to_bytes_returns_filename_and_bytes():
 def test_download_to_bytes_infers_extension_from_content_type():
     fake_resp = MagicMock()
     fake_resp.status_code = 200
-    fake_resp.content = b'png-bytes'
+    fake_resp.iter_content.return_value = [b'png-bytes']
     fake_resp.headers = {'Content-Type': 'image/png'}
     fake_resp.raise_for_status.return_value = None
 
-    with patch('scrapers.image_downloader.requests.get', return_value=fake_resp):
+    with patch('scrapers.image_downloader._session.get', return_value=fake_resp):
         filename, data = download_to_bytes('https://x.example/noext')
         assert filename.endswith('.png')
+
+
+def test_download_to_bytes_prefers_magic_bytes_over_content_type():
+    fake_resp = MagicMock()
+    fake_resp.iter_content.return_value = [b'RIFF\x00\x00\x00\x00WEBPVP8 ']
+    fake_resp.headers = {'Content-Type': 'application/octet-stream'}
+    fake_resp.raise_for_status.return_value = None
+
+    with patch('scrapers.image_downloader._session.get', return_value=fake_resp):
+        filename, _ = download_to_bytes('https://mmbiz.qpic.cn/x/640?wx_fmt=webp')
+        assert filename == '640.webp'
+
+
+def test_download_to_bytes_rejects_oversized_content_length():
+    fake_resp = MagicMock()
+    fake_resp.headers = {'Content-Type': 'image/png', 'Content-Length': str(50 * 1024 * 1024)}
+    fake_resp.raise_for_status.return_value = None
+
+    with patch('scrapers.image_downloader._session.get', return_value=fake_resp):
+        with pytest.raises(ValueError):
+            download_to_bytes('https://x.example/huge.png')
+    fake_resp.iter_content.assert_not_called()
+    fake_resp.close.assert_called_once()
@@ -106,5 +106,48 @@ async def test_article_flow_failure_reports_error(monkeypatch):
         assert 'boom' in sent['error_message']
 
 
+def test_clean_html_concurrent_inline_keeps_order_and_failures():
+    """多图并发下载：按原位置回填；单张失败保留原链接，不影响其余图片。"""
+    from main import _clean_html
+
+    def fake_dl(url, referer=None):
+        if 'bad' in url:
+            raise RuntimeError('404')
+        return (url.rsplit('/', 1)[-1] + '.png', url.encode())
+
+    html = ''.join(
+        f'<img src="https://mmbiz.qpic.cn/{name}">' for name in ('a', 'bad', 'c')
+    )
+    with patch('main.download_to_bytes', side_effect=fake_dl) as dl:
+        out, _ = _clean_html(html)
+
+    assert dl.call_count == 3
+    b64_a = base64.b64encode(b'https://mmbiz.qpic.cn/a').decode()
+    b64_c = base64.b64encode(b'https://mmbiz.qpic.cn/c').decode()
+    assert out.index(b64_a) < out.index('https://mmbiz.qpic.cn/bad') < out.index(b64_c)
+
+
+def test_clean_html_downloads_repeated_image_once():
+    from main import _clean_html
+
+    html = '<img src="https://mmbiz.qpic.cn/logo.png"><p>x</p><img src="https://mmbiz.qpic.cn/logo.png">'
+    with patch('main.download_to_bytes', return_value=('logo.png', b'LOGO')) as dl:
+        out, _ = _clean_html(html)
+
+    assert dl.call_count == 1
+    b64 = base64.b64encode(b'LOGO').decode()
+    assert out.count(f'data:image/png;base64,{b64}') == 2
+
+
+
+def test_clean_html_keeps_markup_as_is():
+    """HTML 直存：不补全/不重排结构（<p> 内嵌块元素、片段内 <title> 原样保留）。"""
+    from main import _clean_html
+
+    html = '<title>t</title><section style="margin:0"><p>a<div>b</div>c</p></section>'
+    out, _ = _clean_html(html)
+
+    assert out == html
+
 # YouTube 转录流程的测试见独立任务（youtube-transcript-api 新版 API 变更，
 # _handle_youtube 待单独适配，不在 HTML 直存任务范围内）。
@@ -0,0 +1,19 @@
+from unittest.mock import MagicMock, patch
+
+from utils import retry
+from utils.retry import backoff_delay, rate_limit_delay
+
+
+def test_backoff_delay_is_exponential_and_capped():
+    assert [backoff_delay(a, 10, jitter=False) for a in range(4)] == [10, 20, 40, 60]
+
+
+def test_rate_limit_delay_prefers_retry_after():
+    resp = MagicMock(headers={'Retry-After': '7'})
+    assert rate_limit_delay(resp, 2, 10) == 7.0
+
+
+def test_rate_limit_delay_falls_back_to_jittered_backoff():
+    resp = MagicMock(headers={'Retry-After': 'soon'})
+    with patch.object(retry.random, 'random', return_value=0.5):
+        assert rate_limit_delay(resp, 2, 10) == 40.0
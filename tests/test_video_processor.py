@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import video_processor
+from video_processor import _correct_transcript
+
+
+_GLOSSARY = {'terms': ['Claude'], 'corrections': {'Clark': 'Claude'}}
+
+
+def _segments(n):
+    # 每段 100 字符，char_budget=4000 → 每批 40 段
+    return [{'start': float(i), 'text': f'{i:03d} Clark ' + 'x' * 90} for i in range(n)]
+
+
+def test_correct_transcript_keeps_batch_order():
+    """批次并发提交，但结果按原顺序写回对应段落。"""
+    segs = _segments(100)
+
+    def fake_batch(texts, glossary):
+        return [t.replace('Clark', 'Claude') for t in texts]
+
+    with patch.object(video_processor, '_load_glossary', return_value=_GLOSSARY), \
+         patch.object(video_processor, '_correct_batch', side_effect=fake_batch) as cb:
+        out = _correct_transcript(segs)
+
+    assert cb.call_count == 3
+    assert [s['text'][:3] for s in out] == [f'{i:03d}' for i in range(100)]
+    assert all('Claude' in s['text'] for s in out)
+
+
+def test_correct_transcript_failed_batch_keeps_original():
+    segs = _segments(50)
+
+    def fake_batch(texts, glossary):
+        if texts[0].startswith('000'):
+            raise ValueError('bad json')
+        return [t.replace('Clark', 'Claude') for t in texts]
+
+    with patch.object(video_processor, '_load_glossary', return_value=_GLOSSARY), \
+         patch.object(video_processor, '_CORRECT_RETRY_DELAY', 0), \
+         patch.object(video_processor, '_correct_batch', side_effect=fake_batch) as cb:
+        out = _correct_transcript(segs)
+
+    # 2 批 + 失败批补做 _CORRECT_RETRIES 次
+    assert cb.call_count == 2 + video_processor._CORRECT_RETRIES
+    assert all('Clark' in s['text'] for s in out[:40])
+    assert all('Claude' in s['text'] for s in out[40:])
+
+
+def test_correct_transcript_retries_transient_failure():
+    """首轮失败的批次在补做轮成功后写回纠错结果。"""
+    segs = _segments(50)
+    calls = {'first': 0}
+
+    def fake_batch(texts, glossary):
+        if texts[0].startswith('000'):
+            calls['first'] += 1
+            if calls['first'] == 1:
+                raise ValueError('503')
+        return [t.replace('Clark', 'Claude') for t in texts]
+
+    with patch.object(video_processor, '_load_glossary', return_value=_GLOSSARY), \
+         patch.object(video_processor, '_CORRECT_RETRY_DELAY', 0), \
+         patch.object(video_processor, '_correct_batch', side_effect=fake_batch):
+        out = _correct_transcript(segs)
+
+    assert calls['first'] == 2
+    assert all('Claude' in s['text'] for s in out)
+
+
+def test_parse_vtt_strips_cue_ids_and_tags(tmp_path):
+    vtt = tmp_path / 'sub.en.vtt'
+    vtt.write_text(
+        'WEBVTT\n\n'
+        '1\n00:00:01.500 --> 00:00:03.000\n<c>Hello</c> world\n\n'
+        '2\n01:02:03.250 --> 01:02:05.000\nsecond line\n',
+        encoding='utf-8',
+    )
+    segs = video_processor._parse_vtt(str(vtt))
+    assert segs == [
+        {'start': 1.5, 'text': 'Hello world'},
+        {'start': 3723.25, 'text': 'second line'},
+    ]
+
+
+def test_call_gemini_json_retries_429_on_shared_session(monkeypatch):
+    monkeypatch.setenv('GEMINI_API_KEY', 'k')
+    limited = MagicMock(status_code=429, headers={'Retry-After': '0'})
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = {'candidates': [{'content': {'parts': [{'text': '{"a": 1}'}]}}]}
+
+    session = MagicMock()
+    session.post.side_effect = [limited, ok]
+    with patch.object(video_processor, 'get_session', return_value=session):
+        assert video_processor._call_gemini_json('p') == {'a': 1}
+    assert session.post.call_count == 2
+
+
+def test_correct_batch_prompt_keeps_glossary_and_texts():
+    with patch.object(video_processor, '_llm_json', return_value=['Claude 1']) as llm:
+        assert video_processor._correct_batch(['Clark 1'], _GLOSSARY) == ['Claude 1']
+    prompt = llm.call_args.args[0]
+    assert 'Canonical proper nouns:\nClaude' in prompt
+    assert '- Clark → Claude' in prompt
+    assert prompt.endswith('["Clark 1"]')
+
+
+def test_translate_paragraphs_chunks_keep_order_and_isolate_failures():
+    # 每段 2500 字符，预算 6000 → 每块 2 段
+    paragraphs = [{'start': i, 'texts': [f'{i}:' + 'x' * 2500]} for i in range(5)]
+
+    def fake_llm(prompt, timeout=60):
+        texts = json.loads(prompt[len(video_processor._TRANSLATE_PROMPT):])
+        if texts[0].startswith('2:'):
+            raise RuntimeError('timeout')
+        return [t.split(':')[0] + '译' for t in texts]
+
+    with patch.object(video_processor, '_llm_json', side_effect=fake_llm) as llm:
+        out = video_processor._translate_paragraphs(paragraphs)
+
+    assert llm.call_count == 3
+    assert out == ['0译', '1译', '', '', '4译']
+
+
+def test_select_keyframe_images_keeps_order_and_skips_failures(tmp_path):
+    keyframes = [{'timestamp_seconds': t} for t in (10, 20, 30)]
+    paragraphs = [{'start': 0.0, 'texts': ['a']}, {'start': 25.0, 'texts': ['b']}]
+
+    def fake_extract(video_path, t, tmpdir, idx):
+        if idx == 1:
+            raise RuntimeError('ffmpeg failed')
+        return [f'{tmpdir}/frames_{idx}/frame_001.jpg']
+
+    with patch.object(video_processor, '_extract_candidate_frames', side_effect=fake_extract), \
+         patch.object(video_processor, '_select_best_frame', side_effect=lambda frames, snip: frames[0]):
+        out = video_processor._select_keyframe_images('v.mp4', keyframes, paragraphs, str(tmp_path))
+
+    assert out == [
+        (10.0, f'{tmp_path}/frames_0/frame_001.jpg'),
+        (30.0, f'{tmp_path}/frames_2/frame_001.jpg'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_video_without_keyframes_cancels_download(monkeypatch):
+    monkeypatch.delenv('SAVE_VIDEO', raising=False)
+    segments = [
+        {'start': 0.0, 'end': 5.0, 'text': '大家好'},
+        {'start': 5.0, 'end': 10.0, 'text': '今天聊聊模型'},
+    ]
+    download_events = []
+
+    async def fake_download(url, tmpdir, cookies_file):
+        download_events.append('started')
+        try:
+            await asyncio.sleep(600)
+        except asyncio.CancelledError:
+            download_events.append('cancelled')
+            raise
+        return f'{tmpdir}/video.mp4'
+
+    with patch.object(video_processor, '_extract_subtitles', return_value=(segments, 'zh')), \
+         patch.object(video_processor, '_correct_transcript', side_effect=lambda segs: segs), \
+         patch.object(video_processor, '_llm_json', return_value={'keyframes': []}), \
+         patch.object(video_processor, '_download_video', side_effect=fake_download):
+        result = await asyncio.wait_for(
+            video_processor.handle_video('a1', 'https://youtu.be/x', 'youtube'), timeout=5
+        )
+
+    assert result['status'] == 'success'
+    assert result['article_images'] is None
+    assert '今天聊聊模型' in result['content_md']
+    assert download_events == ['started', 'cancelled']
+
+
+@pytest.mark.asyncio
+async def test_download_video_kills_ytdlp_when_cancelled(tmp_path, monkeypatch):
+    pid_file = tmp_path / 'pid'
+    fake = tmp_path / 'yt-dlp'
+    fake.write_text(f'#!/bin/sh\necho $$ > {pid_file}\nexec sleep 600\n')
+    fake.chmod(0o755)
+    monkeypatch.setenv('PATH', f'{tmp_path}{os.pathsep}{os.environ["PATH"]}')
+
+    task = asyncio.create_task(video_processor._download_video('https://youtu.be/x', str(tmp_path), None))
+    for _ in range(100):
+        if pid_file.exists() and pid_file.read_text().strip():
+            break
+        await asyncio.sleep(0.05)
+    pid = int(pid_file.read_text())
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)